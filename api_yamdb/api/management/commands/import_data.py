@@ -1,8 +1,12 @@
 import csv
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 from django.conf import settings
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, models, transaction
+from reviews.importers import bulk_import
 from reviews.models import Category, Comment, Genre, Review, Title, User
 
 Models = {
@@ -15,31 +19,198 @@ Models = {
     Title.genre.through: 'genre_title.csv',
 }
 
+# Tables of one level depend only on tables of previous levels.
+Levels = (
+    (User, Category, Genre),
+    (Title,),
+    (Review, Title.genre.through),
+    (Comment,),
+)
+
+COPY_SQL = 'COPY {table} ({columns}) FROM STDIN WITH CSV HEADER'
+SET_DEFAULT_SQL = 'ALTER TABLE {table} ALTER COLUMN {column} SET DEFAULT %s'
+DROP_DEFAULT_SQL = 'ALTER TABLE {table} ALTER COLUMN {column} DROP DEFAULT'
+
+
+def get_copy_defaults(model, columns):
+    '''
+    COPY bypasses model defaults, so every NOT NULL column
+    except the primary key has to be present in the csv file
+    or have a constant default, which is set on the column
+    for the time of COPY.
+    Returns {column: default} for the missing columns,
+    or None if the file can't be loaded with COPY.
+    '''
+    defaults = {}
+    for field in model._meta.concrete_fields:
+        if (
+            field.null or field.column in columns
+            or isinstance(field, models.AutoField)
+        ):
+            continue
+        if not field.has_default() or callable(field.default):
+            return None
+        defaults[field.column] = field.get_db_prep_save(
+            field.get_default(), connection
+        )
+    return defaults
+
 
 class Command(BaseCommand):
     help = 'Импорт данных из csv-файлов'
 
-    def handle(self, *args, **options):
-        answer = input('Очистить базу данных перед импортом? [Y/N]: ').lower()
-        if answer == 'y':
-            User.objects.all().delete()
-            Category.objects.all().delete()
-            Genre.objects.all().delete()
-            Title.objects.all().delete()
-        elif answer == 'n':
-            self.stdout.write('Операция пропущена.')
-        else:
-            return 'Введено некорректное значение.'
-        for model, csv_file in Models.items():
-            with open(
-                os.path.join(settings.STATIC_ROOT, 'data', csv_file),
-                'r', encoding='utf-8'
-            ) as csv_file:
-                reader = csv.DictReader(csv_file)
-                model.objects.bulk_create(
-                    model(**data) for data in reader
+    def add_arguments(self, parser):
+        mode = parser.add_mutually_exclusive_group()
+        mode.add_argument(
+            '--copy',
+            action='store_true',
+            help='Загружать csv-файлы через COPY (только PostgreSQL).'
+        )
+        mode.add_argument(
+            '--ignore-conflicts',
+            action='store_true',
+            help=(
+                'Пропускать строки, конфликтующие с уже существующими '
+                'записями, вместо ошибки импорта.'
+            )
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help=(
+                'Число потоков для параллельной загрузки независимых таблиц. '
+                'При значении больше 1 каждая таблица загружается '
+                'в отдельной транзакции.'
+            )
+        )
+
+    def copy_csv(self, model, columns, csv_file, defaults):
+        quote_name = connection.ops.quote_name
+        table = quote_name(model._meta.db_table)
+        sql = COPY_SQL.format(
+            table=table,
+            columns=', '.join(quote_name(column) for column in columns)
+        )
+        csv_file.seek(0)
+        # The column defaults are changed inside the import transaction,
+        # so they are never visible outside of it.
+        with connection.cursor() as cursor:
+            for column, default in defaults.items():
+                cursor.execute(
+                    SET_DEFAULT_SQL.format(
+                        table=table, column=quote_name(column)
+                    ),
+                    [default]
                 )
+            cursor.copy_expert(sql, csv_file)
+            for column in defaults:
+                cursor.execute(DROP_DEFAULT_SQL.format(
+                    table=table, column=quote_name(column)
+                ))
+
+    def import_csv(self, model, csv_file, batch_size, use_copy,
+                   ignore_conflicts):
+        rows = csv.reader(csv_file)
+        fields = [model._meta.get_field(name) for name in next(rows)]
+        columns = [field.column for field in fields]
+        if use_copy:
+            defaults = get_copy_defaults(model, columns)
+            if defaults is not None:
+                self.copy_csv(model, columns, csv_file, defaults)
+                return
             self.stdout.write(
-                f'Выполнен импорт данных для таблицы {model.__name__}.'
+                f'Таблица {model.__name__} загружается без COPY: '
+                f'в файле {Models[model]} не хватает обязательных столбцов.'
+            )
+        # Foreign keys are set by attname ('author_id'), so the raw ids
+        # from the csv are used as is, without fetching related objects.
+        header = [field.attname for field in fields]
+        rows = (dict(zip(header, row)) for row in rows)
+        if model is Title.genre.through:
+            Title.bulk_link_genres(
+                ((row['title_id'], row['genre_id']) for row in rows),
+                batch_size
             )
-        return f'Выполнен импорт данных для таблицы {model.__name__}.'
+            return
+        bulk_import(model, rows, batch_size, ignore_conflicts)
+
+    def load_csv(self, model, batch_size, use_copy, ignore_conflicts):
+        with open(
+            os.path.join(settings.STATIC_ROOT, 'data', Models[model]),
+            'r', encoding='utf-8'
+        ) as csv_file:
+            self.import_csv(
+                model, csv_file, batch_size, use_copy, ignore_conflicts
+            )
+        self.stdout.write(
+            f'Выполнен импорт данных для таблицы {model.__name__}.'
+        )
+
+    def load_csv_in_thread(self, model, batch_size, use_copy,
+                           ignore_conflicts):
+        '''
+        Loads a csv file in its own transaction,
+        using the database connection of the worker thread.
+        '''
+        try:
+            with transaction.atomic():
+                self.load_csv(model, batch_size, use_copy, ignore_conflicts)
+        finally:
+            connection.close()
+
+    def load_parallel(self, workers, batch_size, use_copy,
+                      ignore_conflicts):
+        '''
+        Loads tables of each level concurrently.
+        A level starts only after the previous one is committed.
+        '''
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for level in Levels:
+                futures = [
+                    executor.submit(
+                        self.load_csv_in_thread,
+                        model, batch_size, use_copy, ignore_conflicts
+                    )
+                    for model in level
+                ]
+                for future in futures:
+                    future.result()
+
+    def handle(self, *args, **options):
+        use_copy = options['copy']
+        ignore_conflicts = options['ignore_conflicts']
+        workers = options['workers']
+        if use_copy and connection.vendor != 'postgresql':
+            raise CommandError('COPY поддерживается только для PostgreSQL.')
+        if workers < 1:
+            raise CommandError('Число потоков должно быть больше нуля.')
+        batch_size = settings.BULK_BATCH_SIZE
+        if batch_size < 1:
+            raise CommandError('BULK_BATCH_SIZE должен быть больше нуля.')
+        answer = input('Очистить базу данных перед импортом? [Y/N]: ').lower()
+        if answer not in ('y', 'n'):
+            return 'Введено некорректное значение.'
+        # Django creates foreign keys as DEFERRABLE INITIALLY DEFERRED,
+        # so inside one transaction they are checked once, on commit.
+        with transaction.atomic():
+            if answer == 'y':
+                User.objects.all().purge()
+                Category.objects.all().delete()
+                Genre.objects.all().delete()
+                Title.objects.all().delete()
+            else:
+                self.stdout.write('Операция пропущена.')
+            if workers == 1:
+                for model in Models:
+                    self.load_csv(
+                        model, batch_size, use_copy, ignore_conflicts
+                    )
+        if workers > 1:
+            self.load_parallel(workers, batch_size, use_copy, ignore_conflicts)
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), Models):
+                cursor.execute(sql)
+        # Bulk loads don't send signals, so ratings are calculated here.
+        Title.objects.update_rating()
+        return 'Импорт данных завершён.'
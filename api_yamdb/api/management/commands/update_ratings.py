@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from reviews.models import Title
+
+
+class Command(BaseCommand):
+    help = 'Пересчёт рейтингов произведений'
+
+    def handle(self, *args, **options):
+        updated = Title.objects.update_rating()
+        return f'Пересчитаны рейтинги {updated} произведений.'
@@ -1,5 +1,12 @@
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 
 
 class ApiPagination(PageNumberPagination):
     page_size = 5
+
+
+class UserCursorPagination(CursorPagination):
+    '''
+    Keyset pagination that doesn't need COUNT(*) over the users table.
+    '''
+    ordering = '-pk'
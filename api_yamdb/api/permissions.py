@@ -2,6 +2,8 @@ from rest_framework.permissions import (SAFE_METHODS, BasePermission,
                                         IsAuthenticated,
                                         IsAuthenticatedOrReadOnly)
 
+_SAFE_METHODS = frozenset(SAFE_METHODS)
+
 
 class IsAdminRole(IsAuthenticated):
     '''
@@ -19,7 +21,7 @@ class IsReadOnly(BasePermission):
     Allows only SAFE_METHODS (GET, HEAD or OPTIONS).
     '''
     def has_permission(self, request, view):
-        return request.method in SAFE_METHODS
+        return request.method in _SAFE_METHODS
 
 
 class RetrieveOnlyOrHasCUDPermissions(IsAuthenticatedOrReadOnly):
@@ -28,14 +30,14 @@ class RetrieveOnlyOrHasCUDPermissions(IsAuthenticatedOrReadOnly):
     Only author, admin and moderator can modify an object.
     '''
     def has_object_permission(self, request, view, obj):
-        if view.action == 'retrieve':
+        if request.method in _SAFE_METHODS:
             return True
 
         user = request.user
         return (
-            user.is_admin
+            obj.author_id == user.pk
+            or user.is_admin
             or user.is_moderator
-            or user == obj.author
         )
 
 
@@ -0,0 +1,26 @@
+import orjson
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class ORJSONRenderer(JSONRenderer):
+    '''
+    Renders responses with orjson instead of the standard json module.
+    Types that orjson doesn't support (lazy strings, Decimal, etc.)
+    are handled by DRF's JSONEncoder.
+    '''
+    encoder = JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        option = orjson.OPT_NON_STR_KEYS
+        # orjson supports only two-space indentation,
+        # so any requested indent is rendered with it.
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(
+            data,
+            default=self.encoder.default,
+            option=option
+        )
@@ -1,5 +1,6 @@
+from django.db.models import Q
+from django.utils.encoding import smart_str
 from rest_framework import serializers
-from rest_framework.validators import UniqueValidator
 from reviews.models import Category, Comment, Genre, Review, Title, User
 
 
@@ -11,18 +12,10 @@ class MeSerializer(serializers.ModelSerializer):
     role = serializers.CharField(read_only=True)
     username = serializers.CharField(
         required=True,
-        max_length=150,
-        validators=[UniqueValidator(
-            queryset=User.objects.all(),
-            message='Поле "username" должно быть уникальным'
-        )]
+        max_length=150
     )
     email = serializers.EmailField(
-        required=True,
-        validators=[UniqueValidator(
-            queryset=User.objects.all(),
-            message='Поле "email" должно быть уникальным'
-        )]
+        required=True
     )
 
     class Meta:
@@ -40,6 +33,30 @@ class MeSerializer(serializers.ModelSerializer):
             )
         return value
 
+    def validate(self, data):
+        '''
+        Checks uniqueness of username and email with a single query.
+        '''
+        unique_fields = [
+            field for field in ('username', 'email') if field in data
+        ]
+        if not unique_fields:
+            return data
+        lookup = Q()
+        for field in unique_fields:
+            lookup |= Q(**{field: data[field]})
+        users = User.objects.filter(lookup)
+        if self.instance is not None:
+            users = users.exclude(pk=self.instance.pk)
+        errors = {}
+        for user in users.values(*unique_fields):
+            for field in unique_fields:
+                if user[field] == data[field]:
+                    errors[field] = f'Поле "{field}" должно быть уникальным'
+        if errors:
+            raise serializers.ValidationError(errors, code='unique')
+        return data
+
 
 class AdminUserSerializer(MeSerializer):
     '''
@@ -86,7 +103,17 @@ class JWTTokenSerializer(serializers.Serializer):
     confirmation_code = serializers.CharField(max_length=150)
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class NameSlugSerializer(serializers.ModelSerializer):
+    '''
+    Base serializer for small reference models.
+    Builds the representation directly from model attributes,
+    since it is rendered for every title in a list.
+    '''
+    def to_representation(self, instance):
+        return {field: getattr(instance, field) for field in self.Meta.fields}
+
+
+class CategorySerializer(NameSlugSerializer):
     '''
     Serializer used to handle Category instances.
     '''
@@ -96,7 +123,7 @@ class CategorySerializer(serializers.ModelSerializer):
         lookup_field = 'slug'
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(NameSlugSerializer):
     '''
     Serializer used to handle Genre instances.
     '''
@@ -113,7 +140,6 @@ class TitleViewSerializer(serializers.ModelSerializer):
     '''
     genre = GenreSerializer(many=True, read_only=True)
     category = CategorySerializer(read_only=True)
-    rating = serializers.FloatField()
 
     class Meta:
         model = Title
@@ -121,15 +147,39 @@ class TitleViewSerializer(serializers.ModelSerializer):
                   'genre', 'category', 'rating')
 
 
+class SlugManyRelatedField(serializers.ManyRelatedField):
+    '''
+    Many-to-many field that resolves all passed slugs
+    with a single query instead of a query per slug.
+    '''
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+        child = self.child_relation
+        slugs = [smart_str(slug) for slug in data]
+        objects = child.get_queryset().in_bulk(
+            slugs, field_name=child.slug_field
+        )
+        for slug in slugs:
+            if slug not in objects:
+                child.fail(
+                    'does_not_exist', slug_name=child.slug_field, value=slug
+                )
+        return [objects[slug] for slug in slugs]
+
+
 class TitlePostSerializer(serializers.ModelSerializer):
     '''
     Serializer used to handle Title instances with
     create, destroy, update and partial update ViewSet methods.
     '''
-    genre = serializers.SlugRelatedField(
-        queryset=Genre.objects.all(),
-        slug_field='slug',
-        many=True
+    genre = SlugManyRelatedField(
+        child_relation=serializers.SlugRelatedField(
+            queryset=Genre.objects.all(),
+            slug_field='slug'
+        )
     )
     category = serializers.SlugRelatedField(
         queryset=Category.objects.all(),
@@ -137,7 +187,7 @@ class TitlePostSerializer(serializers.ModelSerializer):
     )
 
     class Meta:
-        fields = '__all__'
+        exclude = ('rating', 'reviews_count')
         model = Title
 
 
@@ -154,16 +204,6 @@ class ReviewSerializer(serializers.ModelSerializer):
         exclude = ('title',)
         model = Review
 
-    def validate(self, data):
-        is_exist = Review.objects.filter(
-            author=self.context['request'].user,
-            title=self.context['view'].kwargs.get('title_id')).exists()
-        if is_exist and self.context['request'].method == 'POST':
-            raise serializers.ValidationError(
-                'Запрещено добавление более одного отзыва на произведение.'
-            )
-        return data
-
 
 class CommentSerializer(serializers.ModelSerializer):
     '''
@@ -1,20 +1,25 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import default_token_generator
 from django.core.mail import send_mail
-from django.db.models import Avg
+from django.db import IntegrityError, transaction
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import mixins, status, viewsets
 from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import ValidationError
 from rest_framework.filters import SearchFilter
-from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework_simplejwt.tokens import AccessToken
-from reviews.models import Category, Genre, Review, Title
+from reviews.models import Category, Comment, Genre, Review, Title
 
 from .filters import TitleFilter
+from .pagination import UserCursorPagination
 from .permissions import (IsAdminRole, IsMe, IsReadOnly,
                           RetrieveOnlyOrHasCUDPermissions)
 from .serializers import (AdminUserSerializer, CategorySerializer,
@@ -25,21 +30,37 @@ from .serializers import (AdminUserSerializer, CategorySerializer,
 
 User = get_user_model()
 
+logger = logging.getLogger(__name__)
+mail_executor = ThreadPoolExecutor(max_workers=4)
+
+
+def send_code_email(email, confirmation_code):
+    '''
+    Sends email with the confirmation code.
+    Runs in a background thread, so errors are logged.
+    '''
+    try:
+        send_mail(
+            'Код подтверждения',
+            f'Ваш код подтверждения: {confirmation_code}',
+            settings.DEFAULT_FROM_EMAIL,
+            (email,),
+            fail_silently=False,
+        )
+    except Exception:
+        logger.exception('Не удалось отправить код подтверждения на %s', email)
+
 
 def send_code(user):
     '''
     Function that is responsible for
     generating confirmation code for a user
     and sending email with the code to them.
+    The email is sent in a background thread,
+    so the request doesn't wait for the SMTP server.
     '''
     confirmation_code = default_token_generator.make_token(user)
-    send_mail(
-        'Код подтверждения',
-        f'Ваш код подтверждения: {confirmation_code}',
-        settings.DEFAULT_FROM_EMAIL,
-        (user.email,),
-        fail_silently=False,
-    )
+    mail_executor.submit(send_code_email, user.email, confirmation_code)
 
 
 @api_view(['POST'])
@@ -57,12 +78,17 @@ def send_confirmation_code(request):
             username=username,
             email=email
         )
-    except Exception:
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    except IntegrityError:
+        return Response(
+            {'detail': 'Пользователь с таким username или email '
+                       'уже существует.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
     send_code(user)
+    data = {'username': username, 'email': email}
     if created:
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response(data, status=status.HTTP_201_CREATED)
+    return Response(data, status=status.HTTP_200_OK)
 
 
 @api_view(['POST'])
@@ -80,8 +106,8 @@ def get_jwt_token(request):
         User, username=username
     )
     if default_token_generator.check_token(user, confirmation_code):
-        token = AccessToken.for_user(user).access_token()
-        resp = {'token': token}
+        token = AccessToken.for_user(user)
+        resp = {'token': str(token)}
         return Response(resp, status=status.HTTP_200_OK)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -98,7 +124,7 @@ class AdminUserViewSet(viewsets.ModelViewSet):
     permission_classes = (IsAdminRole,)
     filter_backends = (SearchFilter,)
     search_fields = ('username',)
-    pagination_class = LimitOffsetPagination
+    pagination_class = UserCursorPagination
     lookup_field = 'username'
 
     @action(
@@ -109,7 +135,7 @@ class AdminUserViewSet(viewsets.ModelViewSet):
         permission_classes=(IsMe,)
     )
     def me(self, request):
-        user = get_object_or_404(User, username=request.user.username)
+        user = request.user
         if request.method == 'PATCH':
             serializer = MeSerializer(user, data=request.data, partial=True)
             serializer.is_valid(raise_exception=True)
@@ -118,6 +144,9 @@ class AdminUserViewSet(viewsets.ModelViewSet):
         serializer = MeSerializer(user, partial=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    def perform_destroy(self, instance):
+        User.objects.filter(pk=instance.pk).purge()
+
 
 class CreateListViewSet(
     mixins.CreateModelMixin,
@@ -157,11 +186,25 @@ class TitleViewSet(viewsets.ModelViewSet):
     '''
     ViewSet to handle requests to the '.../api/v1/titles/' endpoint.
     '''
-    queryset = Title.objects.annotate(rating=Avg('reviews__score'))
     permission_classes = [IsReadOnly | IsAdminRole]
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
 
+    def get_queryset(self):
+        queryset = Title.objects.with_related()
+        if self.action in ['list', 'retrieve']:
+            return queryset.only(
+                'id', 'name', 'year', 'description', 'rating',
+                'category__name', 'category__slug'
+            )
+        return queryset
+
+    def filter_queryset(self, queryset):
+        query_params = self.request.query_params
+        if not any(name in query_params for name in TitleFilter.base_filters):
+            return queryset
+        return super().filter_queryset(queryset)
+
     def get_serializer_class(self):
         if self.action in ['list', 'retrieve']:
             return TitleViewSerializer
@@ -178,13 +221,37 @@ class ReviewView(viewsets.ModelViewSet):
     serializer_class = ReviewSerializer
     permission_classes = [RetrieveOnlyOrHasCUDPermissions]
 
+    def get_title(self):
+        '''
+        Returns the title from the url, fetched once per request.
+        '''
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(
+                Title.objects.only('id'), pk=self.kwargs.get('title_id')
+            )
+        return self._title
+
     def perform_create(self, serializer):
-        title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
-        serializer.save(author=self.request.user, title=title)
+        '''
+        One review per author is enforced by the
+        'just_one_review_per_author' constraint.
+        '''
+        try:
+            with transaction.atomic():
+                serializer.save(
+                    author=self.request.user, title=self.get_title()
+                )
+        except IntegrityError:
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [
+                'Запрещено добавление более одного отзыва на произведение.'
+            ]})
 
     def get_queryset(self):
-        title = get_object_or_404(Title, pk=self.kwargs.get('title_id'))
-        return title.reviews.all()
+        return Review.objects.filter(
+            title_id=self.kwargs.get('title_id')
+        ).with_author().only(
+            'id', 'text', 'score', 'pub_date', 'title', 'author__username'
+        ).order_by('-pub_date')
 
 
 class CommentView(viewsets.ModelViewSet):
@@ -197,18 +264,25 @@ class CommentView(viewsets.ModelViewSet):
     serializer_class = CommentSerializer
     permission_classes = [RetrieveOnlyOrHasCUDPermissions]
 
+    def get_review(self):
+        '''
+        Returns the review from the url, fetched once per request.
+        '''
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review.objects.only('id'),
+                pk=self.kwargs.get('review_id'),
+                title__pk=self.kwargs.get('title_id')
+            )
+        return self._review
+
     def perform_create(self, serializer):
-        review = get_object_or_404(
-            Review,
-            pk=self.kwargs.get('review_id'),
-            title__pk=self.kwargs.get('title_id')
-        )
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(author=self.request.user, review=self.get_review())
 
     def get_queryset(self):
-        review = get_object_or_404(
-            Review,
-            pk=self.kwargs.get('review_id'),
-            title__pk=self.kwargs.get('title_id')
-        )
-        return review.comments.all()
+        return Comment.objects.filter(
+            review_id=self.kwargs.get('review_id'),
+            review__title_id=self.kwargs.get('title_id')
+        ).with_author().only(
+            'id', 'text', 'pub_date', 'author__username'
+        ).order_by('-pub_date')
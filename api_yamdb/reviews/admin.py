@@ -1,5 +1,26 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
+
+from .models import Comment, Review, User
+
+
+class ShortTextChangeList(ChangeList):
+    def get_queryset(self, request):
+        return super().get_queryset(request).short()
+
+
+class ShortTextAdmin(admin.ModelAdmin):
+    '''
+    Admin for models with a long text.
+    The changelist loads only the beginning of the text.
+    '''
+    list_display = ('__str__', 'pub_date')
+    ordering = ('-pub_date',)
+
+    def get_changelist(self, request, **kwargs):
+        return ShortTextChangeList
 
-from .models import User
 
 admin.site.register(User)
+admin.site.register(Review, ShortTextAdmin)
+admin.site.register(Comment, ShortTextAdmin)
@@ -0,0 +1,33 @@
+from itertools import islice
+
+from django.conf import settings
+from django.db import transaction
+
+
+def get_batches(objs, batch_size):
+    '''
+    Yields lists of at most batch_size objects.
+    '''
+    objs = iter(objs)
+    while True:
+        batch = list(islice(objs, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def bulk_import(model, rows, batch_size=None, ignore_conflicts=False):
+    '''
+    Creates model instances from dicts of field values
+    with multi-row INSERTs of batch_size rows each.
+    With ignore_conflicts, rows that conflict with existing ones
+    are skipped, so the same data can be imported again.
+    '''
+    batch_size = batch_size or settings.BULK_BATCH_SIZE
+    objs = (model(**row) for row in rows)
+    with transaction.atomic():
+        for batch in get_batches(objs, batch_size):
+            model.objects.bulk_create(
+                batch, batch_size=batch_size,
+                ignore_conflicts=ignore_conflicts
+            )
@@ -1,11 +1,62 @@
-import datetime as dt
-
-from django.contrib.auth.models import AbstractUser
-from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.conf import settings
+from django.contrib.auth.models import AbstractUser, UserManager
+from django.core.validators import (BaseValidator, MaxValueValidator,
+                                    MinValueValidator)
+from django.db import models, transaction
+from django.db.models import Avg, Count, OuterRef, Prefetch, Subquery
+from django.db.models.functions import Coalesce, Substr
+from django.utils import timezone
+from django.utils.deconstruct import deconstructible
 from django.utils.translation import gettext_lazy as _
 
 
+def current_year():
+    return timezone.localdate().year
+
+
+@deconstructible
+class MaxCurrentYearValidator(BaseValidator):
+    '''
+    Checks that a year isn't later than the current one.
+    The year is calculated on every check, not on import.
+    '''
+    message = _('Ensure this value is less than or equal to %(limit_value)s.')
+    code = 'max_value'
+
+    def __init__(self, message=None):
+        super().__init__(current_year, message)
+
+    def compare(self, a, b):
+        return a > b
+
+
+class UserQuerySet(models.QuerySet):
+    def purge(self):
+        '''
+        Deletes users with their reviews and comments.
+        Reviews and comments are removed with plain DELETE queries
+        instead of being loaded and deleted one by one. No signals
+        are sent for them, so ratings of the reviewed titles
+        are recalculated here.
+        '''
+        with transaction.atomic(using=self.db):
+            reviews = Review.objects.filter(author__in=self)
+            title_ids = list(
+                reviews.order_by().values_list('title', flat=True).distinct()
+            )
+            Comment.objects.filter(
+                models.Q(author__in=self) | models.Q(review__in=reviews)
+            )._raw_delete(self.db)
+            reviews._raw_delete(self.db)
+            deleted, _ = self.delete()
+            Title.objects.filter(pk__in=title_ids).update_rating()
+        return deleted
+
+
+class PurgingUserManager(UserManager.from_queryset(UserQuerySet)):
+    pass
+
+
 class User(AbstractUser):
     '''
     Creates customized User object.
@@ -15,11 +66,11 @@ class User(AbstractUser):
     USER = 'user'
     MODERATOR = 'moderator'
     ADMIN = 'admin'
-    CHOICES = [
+    CHOICES = (
         (USER, 'Аутентифицированный пользователь'),
         (MODERATOR, 'Модератор'),
         (ADMIN, 'Администратор'),
-    ]
+    )
     email = models.EmailField(
         _('email address'),
         unique=True,
@@ -34,11 +85,14 @@ class User(AbstractUser):
     )
     role = models.CharField(
         _('role'),
-        max_length=max(len(choice) for choice, _ in CHOICES),
+        # Must fit the longest role, 'moderator'.
+        max_length=9,
         choices=CHOICES,
         default=USER
     )
 
+    objects = PurgingUserManager()
+
     @property
     def is_admin(self):
         return self.role == self.ADMIN or self.is_staff
@@ -86,21 +140,50 @@ class Genre(models.Model):
         return self.name
 
 
+class TitleQuerySet(models.QuerySet):
+    def with_related(self):
+        '''
+        Loads category and genres of titles with 2 queries in total.
+        '''
+        return self.select_related('category').prefetch_related(
+            Prefetch('genre', queryset=Genre.objects.only('name', 'slug'))
+        )
+
+    def update_rating(self):
+        '''
+        Recalculates rating and reviews_count of titles
+        with a single UPDATE statement.
+        '''
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')
+        ).order_by().values('title')
+        return self.update(
+            rating=Subquery(
+                reviews.annotate(avg=Avg('score')).values('avg')
+            ),
+            reviews_count=Coalesce(
+                Subquery(reviews.annotate(count=Count('pk')).values('count')),
+                0
+            )
+        )
+
+
 class Title(models.Model):
     '''Creates Title objects.'''
-    name = models.TextField(
+    name = models.CharField(
+        max_length=256,
         verbose_name='Наименование'
     )
     year = models.PositiveIntegerField(
         verbose_name='Год выпуска',
         validators=[
-            MaxValueValidator(dt.datetime.today().year)
+            MaxCurrentYearValidator()
         ],
         error_messages={
             'invalid_date': 'Значение даты введено неправильно'
         }
     )
-    description = models.TextField(
+    description = models.CharField(
         max_length=256,
         verbose_name='Описание',
         null=True,
@@ -114,6 +197,19 @@ class Title(models.Model):
         related_name='titles'
     )
     genre = models.ManyToManyField(Genre, blank=True, related_name='titles')
+    rating = models.FloatField(
+        verbose_name='Рейтинг',
+        null=True,
+        blank=True,
+        editable=False
+    )
+    reviews_count = models.PositiveIntegerField(
+        verbose_name='Количество отзывов',
+        default=0,
+        editable=False
+    )
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Произведение'
@@ -122,6 +218,41 @@ class Title(models.Model):
     def __str__(self):
         return self.name
 
+    @classmethod
+    def bulk_link_genres(cls, pairs, batch_size=None):
+        '''
+        Links titles to genres from (title_id, genre_id) pairs
+        with multi-row INSERTs instead of genre.add() per title.
+        Already existing links are skipped.
+        '''
+        through = cls.genre.through
+        with transaction.atomic():
+            through.objects.bulk_create(
+                (
+                    through(title_id=title_id, genre_id=genre_id)
+                    for title_id, genre_id in pairs
+                ),
+                batch_size=batch_size or settings.BULK_BATCH_SIZE,
+                ignore_conflicts=True
+            )
+
+
+class AuthoredQuerySet(models.QuerySet):
+    def with_author(self):
+        '''
+        Loads authors together with objects,
+        instead of querying them one by one.
+        '''
+        return self.select_related('author')
+
+    def short(self):
+        '''
+        Loads only the first 25 characters of the text
+        instead of the whole field. Other fields stay loaded,
+        since signal receivers read them on delete.
+        '''
+        return self.defer('text').annotate(short_text=Substr('text', 1, 25))
+
 
 class Review(models.Model):
     '''Creates Review objects.'''
@@ -146,22 +277,34 @@ class Review(models.Model):
 
     pub_date = models.DateTimeField(
         verbose_name='Дата публикации',
-        auto_now_add=True,
-        db_index=True
+        auto_now_add=True
     )
 
+    objects = AuthoredQuerySet.as_manager()
+
     class Meta:
-        ordering = ['-pub_date']
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
         constraints = [
             models.UniqueConstraint(
                 fields=['title', 'author'],
                 name='just_one_review_per_author'
+            ),
+            models.CheckConstraint(
+                check=models.Q(score__gte=1, score__lte=10),
+                name='review_score_1_10'
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=['title', '-pub_date'],
+                name='review_title_pub_idx'
             )
         ]
 
     def __str__(self):
+        if hasattr(self, 'short_text'):
+            return self.short_text
         return self.text[:25]
 
 
@@ -180,14 +323,22 @@ class Comment(models.Model):
     )
     pub_date = models.DateTimeField(
         verbose_name='Дата публикации',
-        auto_now_add=True,
-        db_index=True
+        auto_now_add=True
     )
 
+    objects = AuthoredQuerySet.as_manager()
+
     class Meta:
-        ordering = ['-pub_date']
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(
+                fields=['review', '-pub_date'],
+                name='comment_review_pub_idx'
+            )
+        ]
 
     def __str__(self):
+        if hasattr(self, 'short_text'):
+            return self.short_text
         return self.text[:25]
@@ -0,0 +1,63 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Review, Title
+
+
+class RatingUpdate:
+    '''
+    Recalculates ratings of the collected titles once,
+    when the transaction is committed.
+    The update is stored on the connection while it is pending.
+    '''
+    attr = 'pending_rating_update'
+
+    def __init__(self, using):
+        self.using = using
+        self.title_ids = set()
+        self.done = False
+
+    @classmethod
+    def get_pending(cls, using):
+        connection = transaction.get_connection(using)
+        update = getattr(connection, cls.attr, None)
+        if update is None or update.done:
+            update = cls(using)
+            setattr(connection, cls.attr, update)
+        return update
+
+    def __call__(self):
+        if self.done:
+            return
+        self.done = True
+        connection = transaction.get_connection(self.using)
+        if getattr(connection, self.attr, None) is self:
+            delattr(connection, self.attr)
+        Title.objects.using(self.using).filter(
+            pk__in=self.title_ids
+        ).update_rating()
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def update_title_rating(sender, instance, using, **kwargs):
+    '''
+    Keeps denormalized rating of the reviewed title up to date.
+    All reviews saved or deleted in one transaction share
+    a single recalculation, e.g. when a title is deleted
+    together with its reviews.
+
+    The update is registered on every call, since a rolled back
+    savepoint drops the callbacks registered inside it. Only the
+    first call after commit recalculates, the others do nothing.
+    If a transaction is rolled back, its titles are recalculated
+    with the next committed update, which is harmless.
+
+    Two transactions adding reviews to one title at the same time
+    may still store a rating that misses the other's review,
+    until the next one is saved or update_ratings is run.
+    '''
+    update = RatingUpdate.get_pending(using)
+    update.title_ids.add(instance.title_id)
+    transaction.on_commit(update, using=using)
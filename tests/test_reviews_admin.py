@@ -0,0 +1,55 @@
+import pytest
+from django.contrib import admin
+from django.test import RequestFactory
+
+from reviews.models import Comment, Review, Title, User
+
+
+@pytest.fixture
+def superuser():
+    return User.objects.create_superuser(
+        username='admin', email='admin@yamdb.com', password='admin'
+    )
+
+
+@pytest.fixture
+def title(superuser):
+    title = Title.objects.create(name='Title', year=2000)
+    author = User.objects.create(username='author', email='a@yamdb.com')
+    for user, score in ((superuser, 4), (author, 8)):
+        review = Review.objects.create(
+            title=title, author=user, text='Review text ' * 10, score=score
+        )
+        Comment.objects.create(review=review, author=user, text='Comment')
+    return title
+
+
+@pytest.mark.django_db(transaction=True)
+class TestShortTextAdmin:
+
+    def delete_selected(self, model, user):
+        model_admin = admin.site._registry[model]
+        request = RequestFactory().get('/')
+        request.user = user
+        changelist = model_admin.get_changelist_instance(request)
+        model_admin.delete_queryset(request, changelist.get_queryset(request))
+
+    def test_delete_selected_reviews(self, superuser, title):
+        self.delete_selected(Review, superuser)
+        assert not Review.objects.exists(), (
+            'Проверьте, что отзывы удаляются действием "Удалить выбранные"'
+        )
+        assert not Comment.objects.exists()
+        title.refresh_from_db()
+        assert (title.rating, title.reviews_count) == (None, 0), (
+            'Проверьте, что рейтинг произведения пересчитывается '
+            'после удаления отзывов'
+        )
+
+    def test_delete_selected_comments(self, superuser, title):
+        self.delete_selected(Comment, superuser)
+        assert not Comment.objects.exists(), (
+            'Проверьте, что комментарии удаляются действием '
+            '"Удалить выбранные"'
+        )
+        assert Review.objects.count() == 2
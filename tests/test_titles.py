@@ -0,0 +1,45 @@
+import pytest
+from rest_framework.test import APIClient
+
+from reviews.models import Category, Genre, Title
+
+
+@pytest.fixture
+def titles():
+    category = Category.objects.create(name='Фильм', slug='film')
+    genres = [
+        Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+        for i in range(3)
+    ]
+    titles = []
+    for i in range(5):
+        title = Title.objects.create(
+            name=f'Произведение {i}', year=2000, category=category
+        )
+        title.genre.set(genres[:i % 3 + 1])
+        titles.append(title)
+    return titles
+
+
+@pytest.mark.django_db
+class TestTitleQueries:
+
+    def test_title_list(self, titles, django_assert_num_queries):
+        # Count for pagination, titles with categories, genres.
+        with django_assert_num_queries(3):
+            response = APIClient().get('/api/v1/titles/')
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert len(results) == len(titles)
+        assert all(title['category']['slug'] == 'film' for title in results)
+        assert sorted(len(title['genre']) for title in results) == [
+            1, 1, 2, 2, 3
+        ]
+
+    def test_title_detail(self, titles, django_assert_num_queries):
+        title = titles[-1]
+        # Title with its category, genres.
+        with django_assert_num_queries(2):
+            response = APIClient().get(f'/api/v1/titles/{title.pk}/')
+        assert response.status_code == 200
+        assert len(response.json()['genre']) == title.genre.count()